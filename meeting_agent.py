@@ -1,30 +1,109 @@
 import io
 import base64
+import concurrent.futures
+import hashlib
 import json
 import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Deque, Dict, List, Tuple
 
 import streamlit as st
-from crewai import Agent, Task, Crew, LLM
-from crewai.process import Process
-from crewai_tools import SerperDevTool
-from pypdf import PdfReader
+
+# orjson is a Rust extension that is several times faster than stdlib json
+try:
+    import orjson
+
+    def _jloads(data):
+        return orjson.loads(data)
+
+    def _jdumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+except ImportError:
+    def _jloads(data):
+        return json.loads(data)
+
+    def _jdumps(obj) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
 
 
 DATA_DIR = Path(__file__).parent / "data"
 HISTORY_FILE = DATA_DIR / "meeting_history.json"
+HISTORY_MAX_ENTRIES = 20
+# Brief bodies live in one file per history entry; the history JSON only keeps pointers
+BRIEFS_DIR = DATA_DIR / "briefs"
+PARSE_CACHE_DIR = DATA_DIR / "parse_cache"
+PARSE_CACHE_MAX_FILES = 500
 MAX_DOCUMENT_CHARS = 6000
+PRACTICE_WINDOW = 10
+# poppler's pdftotext is much faster than any Python parser on large PDFs
+_HAS_PDFTOTEXT = shutil.which("pdftotext") is not None
+PDFTOTEXT_MIN_BYTES = 256 * 1024
+
+# Invite parsing patterns used by the "Extract Fields" button
+_RE_DUR = re.compile(r"(\d{1,3})\s*(?:min|mins|minutes)")
+_RE_SUBJ = re.compile(r"^\s*(?:subject|title)\s*:\s*(.+)$", re.I)
+_RE_ATT = re.compile(r"(attendees|participants|with:)", re.I)
+
+
+# Heavy dependencies are imported on first use so reruns that never reach the
+# agent pipeline (no API keys, browsing history/themes) skip them entirely.
+# No memoization here: the script module is re-executed on every rerun, and
+# sys.modules already makes repeat imports cheap.
+def _load_crewai():
+    from crewai import Agent, Task, Crew, LLM
+    from crewai.process import Process
+    return Agent, Task, Crew, LLM, Process
+
 
+def _load_search_tool_cls():
+    from crewai_tools import SerperDevTool
+    return SerperDevTool
 
-def _read_history_file() -> List[Dict[str, str]]:
+
+def _load_openai_cls():
+    from openai import OpenAI
+    return OpenAI
+
+
+def _load_pdf_backend():
+    """Return ``(fitz, PdfReader)`` with exactly one of them set."""
+    try:
+        import fitz  # PyMuPDF
+        return fitz, None
+    except ImportError:
+        from pypdf import PdfReader
+        return None, PdfReader
+
+
+def _load_pptx():
+    """Return ``(Presentation, Pt)`` or ``None`` when python-pptx is missing."""
+    try:
+        from pptx import Presentation
+        from pptx.util import Pt
+    except Exception:
+        return None
+    return Presentation, Pt
+
+
+def _read_history_file() -> Deque[Dict[str, str]]:
     if not HISTORY_FILE.exists():
-        return []
+        return deque(maxlen=HISTORY_MAX_ENTRIES)
     try:
-        return json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
+        entries = _jloads(HISTORY_FILE.read_bytes())
     except Exception:
-        return []
+        entries = []
+    return deque(entries, maxlen=HISTORY_MAX_ENTRIES)
+
+
+_RESULT_ATTRS = ("raw", "final_output", "result", "output")
 
 
 def _result_to_markdown(result) -> str:
@@ -36,18 +115,17 @@ def _result_to_markdown(result) -> str:
     # Direct string
     if isinstance(result, str):
         return result
-    # Common CrewAI/CrewOutput fields that may contain text
-    for attr in ("raw", "final_output", "result", "output"):
-        try:
-            val = getattr(result, attr, None)
-        except Exception:
-            val = None
+    # Common CrewAI/CrewOutput fields that may contain text; pydantic models keep
+    # them in __dict__, so a plain dict lookup covers the usual CrewOutput case
+    fields = getattr(result, "__dict__", None) or {}
+    for attr in _RESULT_ATTRS:
+        val = fields[attr] if attr in fields else getattr(result, attr, None)
         if isinstance(val, str) and val.strip():
             return val
     # Dict-like export
     if hasattr(result, "to_dict"):
         try:
-            return json.dumps(result.to_dict(), indent=2, ensure_ascii=False)
+            return _jdumps(result.to_dict())
         except Exception:
             pass
     # Fallback
@@ -63,12 +141,11 @@ def _brief_to_pptx(markdown_text: str, title: str = "Meeting Brief") -> bytes:
     Creates a title slide and subsequent slides for top-level headings and bullets.
     If python-pptx is not installed, returns empty bytes.
     """
-    try:
-        from pptx import Presentation
-        from pptx.util import Pt
-    except Exception:
+    pptx_api = _load_pptx()
+    if pptx_api is None:
         # Dependency missing; return empty and let caller warn
         return b""
+    Presentation, Pt = pptx_api
 
     prs = Presentation()
 
@@ -78,46 +155,62 @@ def _brief_to_pptx(markdown_text: str, title: str = "Meeting Brief") -> bytes:
     slide.shapes.title.text = title
     slide.placeholders[1].text = "Auto-generated from executive brief"
 
-    # Naive markdown parsing for headings and bullets
-    lines = markdown_text.splitlines()
-    current_slide = None
-    bullet_layout = prs.slide_layouts[1]
-
-    def add_slide_with_title(heading: str):
-        nonlocal current_slide
-        current_slide = prs.slides.add_slide(bullet_layout)
-        current_slide.shapes.title.text = heading.strip("# ").strip()
-
-    def add_bullet(text: str):
-        if not current_slide:
-            add_slide_with_title("Details")
-        body = current_slide.shapes.placeholders[1].text_frame
-        if len(body.paragraphs) == 1 and not body.paragraphs[0].text:
-            p = body.paragraphs[0]
+    # Naive markdown parsing: collect (heading, bullets) pairs in one scan,
+    # then build every slide in a single pass
+    sections: List[Tuple[str, List[str]]] = []
+    for line in markdown_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped[:2] == "# " or stripped[:3] == "## ":
+            sections.append((stripped.strip("# ").strip(), []))
         else:
-            p = body.add_paragraph()
-        p.text = text.strip("- *\t ")
-        p.level = 0
-        for run in p.runs:
-            run.font.size = Pt(16)
-
-    for line in lines:
-        if line.strip().startswith("# ") or line.strip().startswith("## "):
-            add_slide_with_title(line)
-        elif line.strip().startswith(("- ", "* ")):
-            add_bullet(line)
-        elif line.strip():
-            # treat as a bullet for simplicity
-            add_bullet(line)
+            # bullets and plain lines alike become bullets for simplicity
+            if not sections:
+                sections.append(("Details", []))
+            sections[-1][1].append(stripped.strip("- *\t "))
+
+    bullet_layout = prs.slide_layouts[1]
+    bullet_size = Pt(16)
+    for heading, bullets in sections:
+        slide = prs.slides.add_slide(bullet_layout)
+        slide.shapes.title.text = heading
+        if not bullets:
+            continue
+        # Look the body placeholder up once per slide, not once per bullet
+        body = slide.shapes.placeholders[1].text_frame
+        for i, text in enumerate(bullets):
+            p = body.paragraphs[0] if i == 0 else body.add_paragraph()
+            p.text = text
+            p.level = 0
+            for run in p.runs:
+                run.font.size = bullet_size
 
     output = io.BytesIO()
     prs.save(output)
     return output.getvalue()
 
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def _brief_to_pptx_cached(markdown_text: str, title: str) -> bytes:
+    """Memoized ``_brief_to_pptx``; identical briefs reuse the rendered deck."""
+    return _brief_to_pptx(markdown_text, title=title)
+
+
 def _write_history_file(entries: List[Dict[str, str]]) -> None:
+    """Atomically persist history."""
+    payload = _jdumps(entries)
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    HISTORY_FILE.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    # A unique temp file per write, so concurrent sessions never replace each other's
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=DATA_DIR, prefix=".meeting_history.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp.write(payload)
+    try:
+        os.replace(tmp.name, HISTORY_FILE)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
 
 
 def _truncate_text(value: str, max_chars: int = MAX_DOCUMENT_CHARS) -> str:
@@ -126,50 +219,245 @@ def _truncate_text(value: str, max_chars: int = MAX_DOCUMENT_CHARS) -> str:
     return value[:max_chars] + "\n\n...[truncated]..."
 
 
+def _join_pages(page_texts, budget: int) -> str:
+    """Join page texts lazily, stopping once ``budget`` characters are collected."""
+    parts: List[str] = []
+    total = 0
+    for text in page_texts:
+        parts.append(text)
+        total += len(text) + 1
+        if total >= budget:
+            break
+    return "\n".join(parts)
+
+
+def _pdf_to_text(file_bytes: bytes, budget: int = MAX_DOCUMENT_CHARS * 2) -> str:
+    """Extract plain text from PDF bytes.
+
+    Large files go through the ``pdftotext`` binary when it is on PATH. Otherwise
+    uses PyMuPDF when installed and falls back to the pure-Python pypdf reader,
+    extracting pages only until ``budget`` characters have been gathered.
+    """
+    if _HAS_PDFTOTEXT and len(file_bytes) > PDFTOTEXT_MIN_BYTES:
+        try:
+            proc = subprocess.run(
+                ["pdftotext", "-layout", "-q", "-", "-"],
+                input=file_bytes,
+                capture_output=True,
+                timeout=30,
+            )
+            if proc.returncode == 0:
+                return proc.stdout.decode("utf-8", errors="ignore")
+        except (OSError, subprocess.SubprocessError):
+            pass
+    fitz, PdfReader = _load_pdf_backend()
+    if fitz is not None:
+        doc = fitz.open(stream=file_bytes, filetype="pdf")
+        try:
+            return _join_pages((page.get_text("text") for page in doc), budget)
+        finally:
+            doc.close()
+    # strict=False skips pypdf's validation passes; extract_text() keeps the
+    # default (plain) extraction mode rather than the slower layout mode
+    reader = PdfReader(io.BytesIO(file_bytes), strict=False)
+    return _join_pages((page.extract_text() or "" for page in reader.pages), budget)
+
+
+def _prune_parse_cache() -> None:
+    """Drop the least recently used parse cache files beyond ``PARSE_CACHE_MAX_FILES``."""
+    files = [p for p in PARSE_CACHE_DIR.glob("*/*") if p.is_file()]
+    if len(files) <= PARSE_CACHE_MAX_FILES:
+        return
+    files.sort(key=lambda p: p.stat().st_atime, reverse=True)
+    for stale in files[PARSE_CACHE_MAX_FILES:]:
+        stale.unlink(missing_ok=True)
+
+
+def _hash_document(data: bytes) -> str:
+    """Content address for an upload (dedup key only, not a security boundary)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _parse_pdf_bytes(doc_hash: str, budget: int, _data: bytes) -> str:
+    """Parse PDF bytes, persisting the text on disk keyed by the precomputed content hash."""
+    h = doc_hash
+    path = PARSE_CACHE_DIR / h[:2] / f"{h}.{budget}.txt"
+    try:
+        if path.exists():
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)  # refresh atime for the LRU sweep
+            return text
+    except OSError:
+        pass
+    text = _pdf_to_text(_data, budget)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        _prune_parse_cache()
+    except OSError:
+        pass
+    return text
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _decode_text_bytes(data: bytes) -> str:
+    return data.decode("utf-8", errors="ignore")
+
+
+def _parse_one(name: str, data: bytes, budget: int, doc_hash: str) -> Dict[str, str]:
+    """Parse a single uploaded file into ``{"name", "content"}`` or ``{"name", "error"}``.
+
+    Runs on worker threads, so it must not render Streamlit elements.
+    """
+    if name.lower().endswith(".pdf"):
+        try:
+            text = _parse_pdf_bytes(doc_hash, budget, data)
+        except Exception as exc:
+            return {"name": name, "error": f"Could not read {name}: {exc}"}
+    else:
+        # Byte-level check avoids decoding whitespace-only files at all
+        if not data.strip():
+            return {"name": name, "content": ""}
+        try:
+            # ``budget`` is twice the preview length and UTF-8 needs at most
+            # 4 bytes per char, so 2 * budget bytes always cover the preview
+            text = _decode_text_bytes(data[: 2 * budget])
+        except Exception as exc:
+            return {"name": name, "error": f"Could not decode {name}: {exc}"}
+    return {"name": name, "content": text.strip()}
+
+
 def _extract_supporting_documents(uploaded_files) -> List[Dict[str, str]]:
-    documents: List[Dict[str, str]] = []
+    # Parse a little beyond the preview length; the digest truncates the rest anyway
+    budget = st.session_state.get("truncate_chars", MAX_DOCUMENT_CHARS) * 2
+    # Parsed results keyed by content hash, so reruns skip extraction entirely;
+    # the on-disk parse cache covers PDFs shared across sessions
+    parsed_cache: Dict[str, Dict[str, str]] = st.session_state.setdefault("_parsed_documents", {})
+
+    keys: List[str] = []
+    hashes: List[str] = []
+    pending: List[Tuple[str, bytes, str, str]] = []
     for uploaded in uploaded_files or []:
         file_bytes = uploaded.getvalue()
         if not file_bytes:
             continue
-        name = uploaded.name
-        text = ""
-        if name.lower().endswith(".pdf"):
-            try:
-                reader = PdfReader(io.BytesIO(file_bytes))
-                text = "\n".join(page.extract_text() or "" for page in reader.pages)
-            except Exception as exc:
-                st.warning(f"Could not read {name}: {exc}")
-                continue
-        else:
-            try:
-                text = file_bytes.decode("utf-8", errors="ignore")
-            except Exception as exc:
-                st.warning(f"Could not decode {name}: {exc}")
-                continue
-        text = text.strip()
-        if text:
-            documents.append({"name": name, "content": text})
+        doc_hash = _hash_document(file_bytes)
+        key = f"{doc_hash}.{budget}.{uploaded.name}"
+        keys.append(key)
+        hashes.append(doc_hash)
+        if key not in parsed_cache:
+            pending.append((key, file_bytes, uploaded.name, doc_hash))
+
+    results: List[Dict[str, str]] = []
+    if len(pending) > 1:
+        # Threads rather than processes: forking the multi-threaded Streamlit
+        # server is unsafe, and spawned workers would re-run this script.
+        # PyMuPDF and the pdftotext subprocess release the GIL while parsing.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(pending))) as ex:
+            results = list(ex.map(
+                _parse_one,
+                [p[2] for p in pending],
+                [p[1] for p in pending],
+                [budget] * len(pending),
+                [p[3] for p in pending],
+            ))
+    else:
+        results = [_parse_one(name, data, budget, doc_hash) for _, data, name, doc_hash in pending]
+    for (key, _, _, _), parsed in zip(pending, results):
+        parsed_cache[key] = parsed
+
+    documents: List[Dict[str, str]] = []
+    for key, doc_hash in zip(keys, hashes):
+        parsed = parsed_cache[key]
+        if "error" in parsed:
+            st.warning(parsed["error"])
+        elif parsed["content"]:
+            # Content hash lets downstream caches key on documents cheaply
+            documents.append({**parsed, "hash": doc_hash})
+    # Keep only the current uploads so removed files do not linger in session state
+    for stale in set(parsed_cache) - set(keys):
+        del parsed_cache[stale]
     return documents
 
 
-def _build_document_digest(documents: List[Dict[str, str]]) -> str:
+def _documents_fingerprint(documents: List[Dict[str, str]]) -> str:
+    """Order-independent fingerprint of the uploaded documents (not a security boundary)."""
+    h = hashlib.blake2b(digest_size=16)
+    for key in sorted(f"{doc['name']}\0{doc['hash']}" for doc in documents):
+        h.update(key.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _build_document_digest(documents: List[Dict[str, str]], limit: int = MAX_DOCUMENT_CHARS) -> str:
     if not documents:
         return "No additional supporting documents were provided."
     sections = []
     for doc in documents:
-        sections.append(
-            f"Document: {doc['name']}\nContent Preview:\n{_truncate_text(doc['content'], st.session_state.get('truncate_chars', MAX_DOCUMENT_CHARS))}"
-        )
+        content = doc["content"]
+        if len(content) > limit:
+            content = content[:limit] + "\n\n...[truncated]..."
+        sections.append(f"Document: {doc['name']}\nContent Preview:\n{content}")
     return "\n\n".join(sections)
 
 
-def _save_meeting_to_history(entry: Dict[str, str]) -> None:
-    entries = st.session_state.get("meeting_history", [])
-    entries.insert(0, entry)
-    entries = entries[:20]
+def _history_entry_id(entry: Dict[str, str]) -> str:
+    # Entries saved before briefs moved to disk have no id; their timestamp is unique enough
+    return entry.get("id") or entry.get("timestamp", "")
+
+
+def _write_brief_file(entry_id: str, brief: str) -> None:
+    BRIEFS_DIR.mkdir(parents=True, exist_ok=True)
+    path = BRIEFS_DIR / f"{entry_id}.md"
+    tmp = path.with_suffix(".md.tmp")
+    tmp.write_text(brief, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _load_brief_by_id(entry_id: str) -> str:
+    try:
+        return (BRIEFS_DIR / f"{entry_id}.md").read_text(encoding="utf-8")
+    except (OSError, ValueError):
+        return ""
+
+
+def _load_history_brief(pointer: Dict[str, str]) -> str:
+    """Resolve a ``history_view`` pointer to the brief text."""
+    text = _load_brief_by_id(pointer["id"])
+    if text:
+        return text
+    # Legacy entries still carry the brief inline
+    for entry in st.session_state.get("meeting_history", []):
+        if _history_entry_id(entry) == pointer["id"]:
+            return entry.get("result", "")
+    return ""
+
+
+@st.cache_resource(show_spinner=False)
+def _history_lock() -> threading.Lock:
+    """Process-wide lock serializing read-modify-write of the history file across sessions."""
+    return threading.Lock()
+
+
+def _save_meeting_to_history(entry: Dict[str, str], brief: str) -> str:
+    """Persist ``brief`` to its own file and record ``entry`` pointing at it; returns the id."""
+    entry_id = uuid.uuid4().hex
+    _write_brief_file(entry_id, brief)
+    entry["id"] = entry_id
+    with _history_lock():
+        # Start from the persisted list, not this session's copy, so entries saved
+        # by other sessions are kept and eviction only drops the true oldest entry
+        entries = _read_history_file()
+        evicted = entries[-1] if len(entries) == entries.maxlen else None
+        # The bounded deque drops the oldest entry on its own
+        entries.appendleft(entry)
+        _write_history_file(list(entries))
+        if evicted is not None and evicted.get("id"):
+            (BRIEFS_DIR / f"{evicted['id']}.md").unlink(missing_ok=True)
+            _load_brief_by_id.clear()
     st.session_state["meeting_history"] = entries
-    _write_history_file(entries)
+    return entry_id
 
 
 def _format_history_option(entry: Dict[str, str]) -> str:
@@ -182,40 +470,426 @@ def _format_history_option(entry: Dict[str, str]) -> str:
 
 
 def _clear_history() -> None:
+    with _history_lock():
+        try:
+            if HISTORY_FILE.exists():
+                HISTORY_FILE.unlink()
+        except Exception:
+            pass
+        shutil.rmtree(BRIEFS_DIR, ignore_errors=True)
+    _load_brief_by_id.clear()
+    # Parsed upload text is as sensitive as the briefs built from it
+    shutil.rmtree(PARSE_CACHE_DIR, ignore_errors=True)
+    _parse_pdf_bytes.clear()
+    st.session_state["meeting_history"] = deque(maxlen=HISTORY_MAX_ENTRIES)
+    st.session_state["history_view"] = None
+
+
+@st.cache_resource(show_spinner=False)
+def _get_llm(model: str, temperature: float, api_key: str):
+    """Share one LLM client per (model, temperature, key) across reruns."""
+    LLM = _load_crewai()[3]
+    return LLM(model=model, temperature=temperature, api_key=api_key)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_search_tool(api_key: str):
+    """Share one Serper tool per key across reruns; the key is read from the env."""
+    os.environ["SERPER_API_KEY"] = api_key
+    return _load_search_tool_cls()()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_openai_client(api_key: str):
+    """Share one OpenAI client per key across reruns (used by quick mode)."""
+    return _load_openai_cls()(api_key=api_key)
+
+
+# Practice Mode prompts: the static instructions come first so repeated turns
+# share a long identical prefix (eligible for provider prompt caching), and
+# only the per-turn fields are substituted at the end.
+_OBJECTION_PROMPT = """
+Generate the next realistic stakeholder objection for a rehearsal.
+Output 1-2 sentences with a sharp, persona-driven objection.
+
+Company: {company}
+Objective: {objective}
+Attendees: {attendees}
+Focus areas: {focus_areas}
+Recent practice log (last 10 turns):
+{history}
+"""
+
+_PRACTICE_TURN_PROMPT = """
+Evaluate the user's response to the last objection, then pose the next objection.
+Respond with a single JSON object and nothing else, using the keys:
+- "score": integer 1-10 rating clarity, evidence, and relevance
+- "tips": list of 3 short coaching tips
+- "refined_answer": a refined sample answer (3-5 sentences)
+- "next_objection": the next sharp, persona-driven objection (1-2 sentences)
+
+Context: {company}, objective: {objective}, attendees: {attendees}, focus areas: {focus_areas}
+Practice log (last 10 turns):
+{history}
+User response:
+{user_response}
+"""
+
+_SHARED_CONTEXT_TEMPLATE = """
+Supporting documents summary:
+{documents_digest}
+
+Historical notes supplied by the team:
+{meeting_notes}
+"""
+
+
+def _directives_text(live_updates: bool, regulatory: bool, has_notes: bool) -> str:
+    """Render the directive bullets for one of the eight toggle combinations.
+
+    Only called from the cached ``_compute_digests``, which memoizes it across reruns.
+    """
+    directives: List[str] = []
+    if live_updates:
+        directives.append(
+            "Incorporate the most recent news, market movements, and growth signals discovered via live search."
+        )
+    if regulatory:
+        directives.append(
+            "Highlight regulatory, compliance, and localization considerations that could influence the meeting."
+        )
+    if has_notes:
+        directives.append(
+            "Bridge insights with the historical notes provided to emphasize continuity and momentum."
+        )
+    return "\n".join(f"- {directive}" for directive in directives) or "- Focus on actionable intelligence."
+
+
+def _isolate_agent(task):
+    """Give ``task`` a private copy of its agent and return it.
+
+    Agents come from ``_build_agents`` in ``st.cache_resource`` and are shared
+    by every session; CrewAI reassigns ``agent.crew`` and ``agent.agent_executor``
+    on each run, so concurrent runs must not use the same instance.
+    ``Agent.copy()`` drops that per-run state but keeps the shared ``llm`` and
+    ``tools``, so nothing lock-holding is duplicated.
+    """
+    task.agent = task.agent.copy()
+    return task.agent
+
+
+def _task_cache_key(task, model: str, temperature: float) -> str:
+    """Hash everything that shapes a task's prompt, including upstream outputs."""
+    h = hashlib.sha256()
+    parts = [model, str(temperature), task.agent.role, task.agent.backstory, task.description, task.expected_output]
+    if isinstance(task.context, list):
+        parts.extend(upstream.output.raw if upstream.output else "" for upstream in task.context)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _run_task_cached(task_key: str, _task):
+    """Run one task in its own crew; the TaskOutput is cached by ``task_key``."""
+    _, _, Crew, _, Process = _load_crewai()
+    Crew(agents=[_task.agent], tasks=[_task], verbose=True, process=Process.sequential).kickoff()
+    return _task.output
+
+
+def _run_task(task, model: str, temperature: float):
+    _isolate_agent(task)
+    # Restoring task.output on a cache hit keeps Task.context working downstream
+    task.output = _run_task_cached(_task_cache_key(task, model, temperature), task)
+    return task.output
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _compute_digests(
+    docs_fingerprint: str,
+    limit: int,
+    notes: str,
+    live_updates: bool,
+    regulatory: bool,
+    _documents: List[Dict[str, str]],
+) -> Tuple[str, str, str]:
+    """Return ``(documents_digest, shared_context, context_directives_text)``.
+
+    ``_documents`` is excluded from the cache key; ``docs_fingerprint`` stands in for it.
+    """
+    documents_digest = _build_document_digest(_documents, limit)
+    shared_context = _SHARED_CONTEXT_TEMPLATE.format(
+        documents_digest=documents_digest,
+        meeting_notes=notes or "No additional notes were provided.",
+    )
+    return documents_digest, shared_context, _directives_text(live_updates, regulatory, bool(notes))
+
+
+def _run_task_dag(tasks, model: str, temperature: float, on_output=None, max_workers: int = 4):
+    """Run ``tasks`` on a thread pool, each as soon as its Task.context has finished.
+
+    The dependency graph is read from Task.context, so the run follows the
+    critical path instead of fixed phases. ``_run_task`` gives each task a
+    private ``Agent.copy()``, so concurrent tasks and sessions never share
+    per-run agent state while still sharing the cached LLM and tool clients.
+    ``on_output(index, output)`` is called on the calling thread as each task
+    completes. Returns every task output in ``tasks`` order.
+    """
+    index_of = {id(task): i for i, task in enumerate(tasks)}
+    deps = [
+        {index_of[id(up)] for up in task.context if id(up) in index_of} if isinstance(task.context, list) else set()
+        for task in tasks
+    ]
+    outputs = [None] * len(tasks)
+    done = set()
+    pending: Dict[concurrent.futures.Future, int] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit_ready():
+            running = set(pending.values())
+            for i, task in enumerate(tasks):
+                if i not in done and i not in running and deps[i] <= done:
+                    pending[executor.submit(_run_task, task, model, temperature)] = i
+
+        submit_ready()
+        while pending:
+            finished, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                i = pending.pop(future)
+                outputs[i] = future.result()
+                done.add(i)
+                if on_output is not None:
+                    on_output(i, outputs[i])
+            submit_ready()
+    return outputs
+
+
+# Quick mode: one structured-output call returns every section of the brief.
+# Keys follow the order of the preparation tasks.
+_BRIEF_SECTION_KEYS = ("context", "industry", "strategy", "brief", "rehearsal", "followup")
+
+_BRIEF_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "meeting_brief",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {key: {"type": "string"} for key in _BRIEF_SECTION_KEYS},
+            "required": list(_BRIEF_SECTION_KEYS),
+            "additionalProperties": False,
+        },
+    },
+}
+
+_STRUCTURED_BRIEF_PROMPT = """
+You are a team of meeting preparation specialists producing a complete preparation package in one pass.
+Return a single JSON object with one markdown string per section key listed below.
+Each section builds on the ones before it; keep headings and subheadings in markdown.
+Live web search is not available, so rely on the shared materials and your own knowledge.
+
+Shared materials (referred to below as "your background"):
+{shared_context}
+{sections}
+"""
+
+
+def _structured_brief_prompt(tasks, shared_context: str) -> str:
+    """Fold the task descriptions into one prompt, stating the shared materials once."""
+    sections = []
+    for key, task in zip(_BRIEF_SECTION_KEYS, tasks):
+        sections.append(
+            f"\n=== SECTION: {key} ===\nRole: {task.agent.role}\n{task.description.strip()}\n"
+            f"Expected output: {task.expected_output}\n=== END SECTION: {key} ==="
+        )
+    return _STRUCTURED_BRIEF_PROMPT.format(shared_context=shared_context, sections="\n".join(sections))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _run_structured_brief(prompt: str, model: str, temperature: float, _api_key: str) -> Dict[str, str]:
+    """Run the single-call brief and return ``{section_key: markdown}``.
+
+    Raises ``ValueError`` when every section is empty (e.g. a refusal), which
+    also keeps the empty reply out of the cache.
+    """
+    response = _get_openai_client(_api_key).chat.completions.create(
+        model=model,
+        temperature=temperature,
+        messages=[{"role": "user", "content": prompt}],
+        response_format=_BRIEF_RESPONSE_FORMAT,
+    )
+    message = response.choices[0].message
+    payload = _jloads(message.content or "{}")
+    sections = {key: str(payload.get(key, "")).strip() for key in _BRIEF_SECTION_KEYS}
+    if not any(sections.values()):
+        raise ValueError(getattr(message, "refusal", None) or "The model returned no content for the brief.")
+    return sections
+
+
+@st.cache_resource(show_spinner=False)
+def _pptx_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Process-wide worker pool for building slide decks off the script thread."""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+
+def _append_practice_turn(role: str, content: str) -> None:
+    """Record a practice turn in the full log and the rolling prompt window."""
+    st.session_state["practice_history"].append({"role": role, "content": content})
+    st.session_state["practice_recent"].append(f"{role}: {content}")
+
+
+def _render_practice_log(slot, history: List[Dict[str, str]]) -> None:
+    """Render the practice log into ``slot`` as a single markdown element."""
+    if not history:
+        slot.empty()
+        return
+    turns = [
+        f"**{'Coach' if turn.get('role', 'coach') == 'coach' else 'You'}:**\n\n{turn.get('content', '')}"
+        for turn in history
+    ]
+    slot.markdown("### Session log\n\n" + "\n\n".join(turns))
+
+
+def _kickoff_practice(task):
+    # A fresh crew and agent copy per turn: cached ones are shared between sessions
+    _, _, Crew, _, Process = _load_crewai()
+    agent = _isolate_agent(task)
+    return Crew(agents=[agent], tasks=[task], verbose=False, process=Process.sequential).kickoff()
+
+
+def _parse_practice_turn(raw: str) -> Dict[str, object]:
+    """Extract the JSON object from a combined score/next-objection reply, or ``{}``."""
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end <= start:
+        return {}
     try:
-        if HISTORY_FILE.exists():
-            HISTORY_FILE.unlink()
+        parsed = _jloads(raw[start:end + 1])
     except Exception:
-        pass
-    st.session_state["meeting_history"] = []
-    st.session_state["history_view"] = None
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
 
 
-# Streamlit app setup
-st.set_page_config(page_title="AI Meeting Agent 📝", layout="wide")
+def _format_practice_feedback(turn: Dict[str, object]) -> str:
+    tips = turn.get("tips") or []
+    if isinstance(tips, str):
+        tips = [tips]
+    parts = [f"**Score:** {turn.get('score', 'n/a')}/10"]
+    if tips:
+        parts.append("**Coaching tips:**\n" + "\n".join(f"- {tip}" for tip in tips))
+    if turn.get("refined_answer"):
+        parts.append(f"**Refined answer:**\n\n{turn['refined_answer']}")
+    return "\n\n".join(parts)
 
 
-def _inject_theme_css(preset: str = "Neon Night") -> None:
-    """Inject custom CSS for multiple colorful themes and subtle animations.
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _build_agents(model: str, temperature: float, openai_key: str, serper_key: str) -> Dict[str, object]:
+    """Construct the six preparation agents once per model/key combination.
 
-    Presets: 'Neon Night', 'Emerald Dark', 'Sunset Dark', 'Light Minimal'
+    The agents carry no per-meeting inputs; ``_with_materials`` adds those per run.
+    """
+    Agent = _load_crewai()[0]
+    llm = _get_llm(model, temperature, openai_key)
+    search_tool = _get_search_tool(serper_key)
+    return {
+        "context_analyzer": Agent(
+            role="Meeting Context Specialist",
+            goal="Analyze and summarize key background information for the meeting",
+            backstory="You are an expert at quickly understanding complex business contexts and identifying critical information.",
+            verbose=True,
+            allow_delegation=False,
+            llm=llm,
+            tools=[search_tool],
+        ),
+        "industry_insights_generator": Agent(
+            role="Industry Expert",
+            goal="Provide in-depth industry analysis and identify key trends",
+            backstory="You are a seasoned industry analyst with a knack for spotting emerging trends and opportunities.",
+            verbose=True,
+            allow_delegation=False,
+            llm=llm,
+            tools=[search_tool],
+        ),
+        "strategy_formulator": Agent(
+            role="Meeting Strategist",
+            goal="Develop a tailored meeting strategy and detailed agenda",
+            backstory="You are a master meeting planner, known for creating highly effective strategies and agendas.",
+            verbose=True,
+            allow_delegation=False,
+            llm=llm,
+        ),
+        "executive_briefing_creator": Agent(
+            role="Communication Specialist",
+            goal="Synthesize information into concise and impactful briefings",
+            backstory="You are an expert communicator, skilled at distilling complex information into clear, actionable insights.",
+            verbose=True,
+            allow_delegation=False,
+            llm=llm,
+        ),
+        "rehearsal_coach": Agent(
+            role="Executive Rehearsal Coach",
+            goal="Simulate the meeting experience and stress-test positioning",
+            backstory="You facilitate realistic rehearsals, crafting likely objections and guiding executives on confident responses.",
+            verbose=True,
+            allow_delegation=False,
+            llm=llm,
+        ),
+        "follow_up_partner": Agent(
+            role="Post-Meeting Activation Partner",
+            goal="Translate insights into action items, follow-ups, and enablement assets",
+            backstory="You ensure every meeting converts into momentum with crisply defined next steps and communication plans.",
+            verbose=True,
+            allow_delegation=False,
+            llm=llm,
+        ),
+    }
+
+
+def _with_materials(agents: Dict[str, object], shared_context: str, documents_digest: str) -> Dict[str, object]:
+    """Return ``agents`` with the meeting materials opening the backstories that use them.
+
+    Only the three consuming agents are copied (``Agent.copy()`` keeps the cached
+    LLM and tools); the others stay the shared cached instances. Materials are
+    stated once per agent instead of being repeated in every task description.
     """
-    p = preset.lower()
-    if p == "emerald dark":
-        primary, accent = "#34d399", "#22d3ee"
-        bg, bg2, text, subtle = "#0a0f0f", "#0f1717", "#e7f6f2", "#7aa3a3"
-    elif p == "sunset dark":
-        primary, accent = "#fb7185", "#f59e0b"
-        bg, bg2, text, subtle = "#0f0b10", "#17101a", "#f5e9f1", "#b08aa6"
-    elif p == "light minimal":
-        primary, accent = "#6366f1", "#06b6d4"
-        bg, bg2, text, subtle = "#f7f8fc", "#ffffff", "#0b0f19", "#475569"
-    else:  # Neon Night (default)
-        primary, accent = "#9b87f5", "#22d3ee"
-        bg, bg2, text, subtle = "#0b0f19", "#121829", "#E6EAF2", "#94a3b8"
-
-        st.markdown(
-                f"""
+    prefixes = {
+        "context_analyzer": f"Shared materials:\n{shared_context}",
+        "industry_insights_generator": f"Supporting materials:\n{documents_digest}",
+        "executive_briefing_creator": f"Shared materials:\n{shared_context}",
+    }
+    run_agents = dict(agents)
+    for name, prefix in prefixes.items():
+        agent = agents[name].copy()
+        agent.backstory = f"{prefix}\n\n{agents[name].backstory}"
+        run_agents[name] = agent
+    return run_agents
+
+
+# Streamlit app setup
+st.set_page_config(page_title="AI Meeting Agent 📝", layout="wide")
+
+
+_THEME_PALETTES: Dict[str, Dict[str, str]] = {
+    "neon night": {
+        "primary": "#9b87f5", "accent": "#22d3ee",
+        "bg": "#0b0f19", "bg2": "#121829", "text": "#E6EAF2", "subtle": "#94a3b8",
+    },
+    "emerald dark": {
+        "primary": "#34d399", "accent": "#22d3ee",
+        "bg": "#0a0f0f", "bg2": "#0f1717", "text": "#e7f6f2", "subtle": "#7aa3a3",
+    },
+    "sunset dark": {
+        "primary": "#fb7185", "accent": "#f59e0b",
+        "bg": "#0f0b10", "bg2": "#17101a", "text": "#f5e9f1", "subtle": "#b08aa6",
+    },
+    "light minimal": {
+        "primary": "#6366f1", "accent": "#06b6d4",
+        "bg": "#f7f8fc", "bg2": "#ffffff", "text": "#0b0f19", "subtle": "#475569",
+    },
+}
+
+# Plain str.format template; literal CSS braces are doubled.
+_THEME_CSS_TEMPLATE = """
                 <style>
                 :root {{
                     --primary: {primary};
@@ -381,9 +1055,28 @@ def _inject_theme_css(preset: str = "Neon Night") -> None:
                                     100% {{ transform: translateY(0); }}
                                 }}
                 </style>
-                """,
-                unsafe_allow_html=True,
-        )
+                """
+
+
+@st.cache_resource(show_spinner=False)
+def _theme_css_blobs() -> Dict[str, str]:
+    """Render every theme preset once per process rather than on every rerun."""
+    return {
+        name: _THEME_CSS_TEMPLATE.format(**palette)
+        for name, palette in _THEME_PALETTES.items()
+    }
+
+
+def _inject_theme_css(preset: str = "Neon Night") -> None:
+    """Inject custom CSS for multiple colorful themes and subtle animations.
+
+    Presets: 'Neon Night', 'Emerald Dark', 'Sunset Dark', 'Light Minimal'
+    """
+    blobs = _theme_css_blobs()
+    css = blobs.get(preset.lower(), blobs["neon night"])
+    # Streamlit drops elements that are not re-emitted on a rerun, so the
+    # style block is sent every run; only the string building is cached.
+    st.markdown(css, unsafe_allow_html=True)
 
 
 st.markdown(
@@ -402,20 +1095,26 @@ if "meeting_history" not in st.session_state:
 if "history_view" not in st.session_state:
     st.session_state["history_view"] = None
 
+LOGO_PATH = Path(__file__).parent / "Logo.png"
+_LOGO_HTML = """
+                <div class="sidebar-logo-wrap">
+                  <img class="sidebar-logo" src="{src}" alt="App Logo" />
+                </div>
+                """
+
+
+@st.cache_data(show_spinner=False)
+def _logo_html(mtime: float) -> str:
+    """Build the logo markup once per file version (``mtime`` is the cache key)."""
+    src = "data:image/png;base64," + base64.b64encode(LOGO_PATH.read_bytes()).decode("ascii")
+    return _LOGO_HTML.format(src=src)
+
+
 # Sidebar for API keys
 def _render_sidebar_logo():
     try:
-        logo_path = Path(__file__).parent / "Logo.png"
-        if logo_path.exists():
-            b64 = base64.b64encode(logo_path.read_bytes()).decode("ascii")
-            st.sidebar.markdown(
-                f"""
-                <div class="sidebar-logo-wrap">
-                  <img class="sidebar-logo" src="data:image/png;base64,{b64}" alt="App Logo" />
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+        if LOGO_PATH.exists():
+            st.sidebar.markdown(_logo_html(LOGO_PATH.stat().st_mtime), unsafe_allow_html=True)
         else:
             # Minimal fallback if image missing
             st.sidebar.markdown(
@@ -473,7 +1172,11 @@ if history_entries:
         format_func=lambda idx: _format_history_option(history_entries[idx]),
         key="history_selector"
     )
-    st.session_state["history_view"] = history_entries[selected_idx]
+    # Only a pointer lives in session state; the brief text is loaded on demand
+    st.session_state["history_view"] = {
+        "id": _history_entry_id(history_entries[selected_idx]),
+        "company": history_entries[selected_idx].get("company", ""),
+    }
     if st.sidebar.button("Load into form", use_container_width=True):
         selected = history_entries[selected_idx]
         st.session_state["company_name"] = selected.get("company", "")
@@ -492,12 +1195,11 @@ with st.sidebar.expander("Library actions"):
 
 # Check if required API keys are set
 if openai_api_key and serper_api_key:
+    _, Task, Crew, _, Process = _load_crewai()
+
     os.environ["OPENAI_API_KEY"] = openai_api_key
     os.environ["SERPER_API_KEY"] = serper_api_key
 
-    llm = LLM(model=model_name, temperature=temperature_setting, api_key=openai_api_key)
-    search_tool = SerperDevTool()
-
     company_name = st.text_input("Enter the company name:", key="company_name")
     meeting_objective = st.text_input("Enter the meeting objective:", key="meeting_objective")
     attendees = st.text_area("Enter the attendees and their roles (one per line):", key="attendees")
@@ -559,16 +1261,17 @@ if openai_api_key and serper_api_key:
                 try:
                     for line in (invite_text or "").splitlines():
                         ls = line.strip()
-                        if not company_guess and ls.lower().startswith(("subject:", "title:")):
-                            company_guess = ls.split(":", 1)[-1].strip()
-                        if any(tok in ls.lower() for tok in ["attendees", "participants", "with:"]):
-                            attendees_guess.append(ls)
-                        if any(tok in ls.lower() for tok in ["duration", "minutes", "mins", "min"]):
-                            # naive duration capture
-                            import re
-                            m = re.search(r"(\d{1,3})\s*(min|mins|minutes)", ls.lower())
+                        ls_low = ls.lower()
+                        if not company_guess:
+                            m = _RE_SUBJ.match(ls)
                             if m:
-                                duration_guess = int(m.group(1))
+                                company_guess = m.group(1).strip()
+                        if _RE_ATT.search(ls):
+                            attendees_guess.append(ls)
+                        # naive duration capture
+                        m = _RE_DUR.search(ls_low)
+                        if m:
+                            duration_guess = int(m.group(1))
                 except Exception:
                     pass
 
@@ -581,7 +1284,14 @@ if openai_api_key and serper_api_key:
                 st.success("Invite fields extracted into the form.")
 
     supporting_documents = _extract_supporting_documents(uploaded_files)
-    documents_digest = _build_document_digest(supporting_documents)
+    documents_digest, shared_context, context_directives_text = _compute_digests(
+        _documents_fingerprint(supporting_documents),
+        st.session_state.get("truncate_chars", MAX_DOCUMENT_CHARS),
+        meeting_notes,
+        include_live_updates,
+        include_regulatory,
+        supporting_documents,
+    )
 
     if supporting_documents:
         st.info(f"{len(supporting_documents)} supporting document(s) ingested for analysis.")
@@ -590,85 +1300,10 @@ if openai_api_key and serper_api_key:
                 preview_len = min(st.session_state.get("truncate_chars", MAX_DOCUMENT_CHARS), 800)
                 st.markdown(f"**{doc['name']}**\n\n{_truncate_text(doc['content'], preview_len)}")
 
-    context_directives: List[str] = []
-    if include_live_updates:
-        context_directives.append(
-            "Incorporate the most recent news, market movements, and growth signals discovered via live search."
-        )
-    if include_regulatory:
-        context_directives.append(
-            "Highlight regulatory, compliance, and localization considerations that could influence the meeting."
-        )
-    if meeting_notes:
-        context_directives.append(
-            "Bridge insights with the historical notes provided to emphasize continuity and momentum."
-        )
-
-    context_directives_text = "\n".join(f"- {directive}" for directive in context_directives) or "- Focus on actionable intelligence." 
-
-    shared_context = f"""
-Supporting documents summary:
-{documents_digest}
-
-Historical notes supplied by the team:
-{meeting_notes or 'No additional notes were provided.'}
-"""
-
-    # Define the agents
-    context_analyzer = Agent(
-        role="Meeting Context Specialist",
-        goal="Analyze and summarize key background information for the meeting",
-        backstory="You are an expert at quickly understanding complex business contexts and identifying critical information.",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm,
-        tools=[search_tool]
-    )
-
-    industry_insights_generator = Agent(
-        role="Industry Expert",
-        goal="Provide in-depth industry analysis and identify key trends",
-        backstory="You are a seasoned industry analyst with a knack for spotting emerging trends and opportunities.",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm,
-        tools=[search_tool]
-    )
-
-    strategy_formulator = Agent(
-        role="Meeting Strategist",
-        goal="Develop a tailored meeting strategy and detailed agenda",
-        backstory="You are a master meeting planner, known for creating highly effective strategies and agendas.",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm,
-    )
-
-    executive_briefing_creator = Agent(
-        role="Communication Specialist",
-        goal="Synthesize information into concise and impactful briefings",
-        backstory="You are an expert communicator, skilled at distilling complex information into clear, actionable insights.",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm,
-    )
-
-    rehearsal_coach = Agent(
-        role="Executive Rehearsal Coach",
-        goal="Simulate the meeting experience and stress-test positioning",
-        backstory="You facilitate realistic rehearsals, crafting likely objections and guiding executives on confident responses.",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm,
-    )
-
-    follow_up_partner = Agent(
-        role="Post-Meeting Activation Partner",
-        goal="Translate insights into action items, follow-ups, and enablement assets",
-        backstory="You ensure every meeting converts into momentum with crisply defined next steps and communication plans.",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm,
+    agents = _with_materials(
+        _build_agents(model_name, temperature_setting, openai_api_key, serper_api_key),
+        shared_context,
+        documents_digest,
     )
 
     # Live Transcript (paste) - summarize and extract actions
@@ -697,10 +1332,10 @@ Historical notes supplied by the team:
                 Transcript:
                 {transcript_text}
                 """,
-                agent=follow_up_partner,
+                agent=agents["follow_up_partner"],
                 expected_output="Concise summary with decisions, action items, and risks as markdown."
             )
-            temp_crew = Crew(agents=[follow_up_partner], tasks=[task], verbose=False, process=Process.sequential)
+            temp_crew = Crew(agents=[_isolate_agent(task)], tasks=[task], verbose=False, process=Process.sequential)
             with st.spinner("Extracting action items and summary..."):
                 try:
                     tx_result = temp_crew.kickoff()
@@ -713,7 +1348,7 @@ Historical notes supplied by the team:
                 try:
                     st.download_button(
                         label="Download transcript summary",
-                        data=tx_text,
+                        data=lambda: tx_text,
                         file_name=f"transcript_summary_{company_name}.md",
                         mime="text/markdown",
                         key="download_tx_summary"
@@ -729,9 +1364,8 @@ Historical notes supplied by the team:
                         "attendees": attendees,
                         "focusAreas": focus_areas,
                         "documents": [],
-                        "result": tx_text,
                     }
-                    _save_meeting_to_history(entry)
+                    _save_meeting_to_history(entry, tx_text)
                     st.success("Transcript summary saved to library.")
 
     # Define the tasks
@@ -746,8 +1380,7 @@ Historical notes supplied by the team:
         Directives to prioritize:
         {context_directives_text}
 
-        Reference the following shared materials:
-        {shared_context}
+        Reference the shared materials provided in your background.
 
         Research {company_name} thoroughly, including:
         1. Recent news and press releases (refresh if new headlines are available)
@@ -757,7 +1390,7 @@ Historical notes supplied by the team:
         Provide a comprehensive summary of your findings, highlighting the most relevant information for the meeting context.
         Format output using markdown with clear headings and subheadings.
         """,
-        agent=context_analyzer,
+        agent=agents["context_analyzer"],
         expected_output="Detailed meeting context analysis covering company background, latest developments, and insights tied to the objective."
     )
 
@@ -769,13 +1402,12 @@ Historical notes supplied by the team:
         3. Highlight potential opportunities and threats for the meeting sponsor
         4. Provide insights on market positioning compared to peers
 
-        Supporting materials to infuse:
-        {documents_digest}
+        Infuse the supporting materials provided in your background.
 
         Ensure the analysis is relevant to the meeting objective and attendees' roles.
         Format output using markdown with appropriate headings and subheadings.
         """,
-        agent=industry_insights_generator,
+        agent=agents["industry_insights_generator"],
         expected_output="Comprehensive industry analysis aligned to the meeting goal, emphasizing opportunities, risks, and differentiation."
     )
 
@@ -792,8 +1424,9 @@ Historical notes supplied by the team:
         Ensure the strategy and agenda align with the meeting objective: {meeting_objective}
         Format output using markdown with appropriate headings and subheadings.
         """,
-        agent=strategy_formulator,
-        expected_output="Detailed meeting strategy and time-boxed agenda mapping objectives to owners, talking points, and success signals."
+        agent=agents["strategy_formulator"],
+        expected_output="Detailed meeting strategy and time-boxed agenda mapping objectives to owners, talking points, and success signals.",
+        context=[context_analysis_task, industry_analysis_task]
     )
 
     executive_brief_task = Task(
@@ -823,11 +1456,11 @@ Historical notes supplied by the team:
            - Suggest timelines or deadlines for key actions
            - Identify potential challenges or roadblocks and propose mitigation strategies
 
-        Ensure the brief is comprehensive yet concise, highly actionable, and precisely aligned with the meeting objective: {meeting_objective}. The document should be structured for easy navigation and quick reference during the meeting. Integrate the shared materials below when relevant:
-        {shared_context}
+        Ensure the brief is comprehensive yet concise, highly actionable, and precisely aligned with the meeting objective: {meeting_objective}. The document should be structured for easy navigation and quick reference during the meeting. Integrate the shared materials provided in your background when relevant.
         """,
-        agent=executive_briefing_creator,
-        expected_output="Executive-ready brief including summary, key talking points, risk mitigation, and strategic recommendations."
+        agent=agents["executive_briefing_creator"],
+        expected_output="Executive-ready brief including summary, key talking points, risk mitigation, and strategic recommendations.",
+        context=[context_analysis_task, industry_analysis_task]
     )
 
     rehearsal_simulation_task = Task(
@@ -842,8 +1475,9 @@ Historical notes supplied by the team:
 
         Reference the broader preparation outputs so the rehearsal reflects the planned meeting arc.
         """,
-        agent=rehearsal_coach,
-        expected_output="Simulation guide featuring persona-based Q&A, objection handling, and coaching cues."
+        agent=agents["rehearsal_coach"],
+        expected_output="Simulation guide featuring persona-based Q&A, objection handling, and coaching cues.",
+        context=[strategy_development_task]
     )
 
     follow_up_activation_task = Task(
@@ -857,71 +1491,82 @@ Historical notes supplied by the team:
 
         Integrate the shared preparation context and emphasize how to maintain momentum immediately after the meeting concludes.
         """,
-        agent=follow_up_partner,
-        expected_output="Post-meeting activation kit featuring action tracker, follow-up messaging, and enablement guidance."
+        agent=agents["follow_up_partner"],
+        expected_output="Post-meeting activation kit featuring action tracker, follow-up messaging, and enablement guidance.",
+        context=[executive_brief_task]
     )
 
-    meeting_prep_crew = Crew(
-        agents=[
-            context_analyzer,
-            industry_insights_generator,
-            strategy_formulator,
-            executive_briefing_creator,
-            rehearsal_coach,
-            follow_up_partner,
-        ],
-        tasks=[
-            context_analysis_task,
-            industry_analysis_task,
-            strategy_development_task,
-            executive_brief_task,
-            rehearsal_simulation_task,
-            follow_up_activation_task,
-        ],
-        verbose=True,
-        process=Process.sequential
+    # Task.context defines the dependency graph; independent tasks run concurrently
+    meeting_prep_tasks = [
+        context_analysis_task,
+        industry_analysis_task,
+        strategy_development_task,
+        executive_brief_task,
+        rehearsal_simulation_task,
+        follow_up_activation_task,
+    ]
+
+    detailed_mode = st.toggle(
+        "Detailed mode (multi-agent crew with live search)",
+        value=True,
+        key="detailed_mode",
+        help="Off: a single structured call drafts every section at once, which is faster but skips web search.",
     )
 
     if st.button("Prepare Meeting"):
         if not company_name or not meeting_objective:
             st.warning("Please provide both a company name and meeting objective before preparing the meeting.")
         else:
+            # Render each section as its task completes rather than after the whole run
+            brief_placeholder = st.empty()
+            sections = [""] * len(meeting_prep_tasks)
+
+            def show_section(index, output):
+                sections[index] = _result_to_markdown(output)
+                brief_placeholder.markdown("\n\n".join(section for section in sections if section))
+
             with st.spinner("AI agents are preparing your meeting..."):
                 try:
-                    result = meeting_prep_crew.kickoff()
+                    if detailed_mode:
+                        _run_task_dag(meeting_prep_tasks, model_name, temperature_setting, show_section)
+                    else:
+                        try:
+                            quick_sections = _run_structured_brief(
+                                _structured_brief_prompt(meeting_prep_tasks, shared_context),
+                                model_name,
+                                temperature_setting,
+                                openai_api_key,
+                            )
+                        except ValueError as exc:
+                            st.warning(f"Quick mode produced no brief: {exc} Try again or switch on Detailed mode.")
+                            quick_sections = {}
+                        for index, key in enumerate(_BRIEF_SECTION_KEYS):
+                            show_section(index, quick_sections.get(key, ""))
+                    result = "\n\n".join(section for section in sections if section)
                 except Exception as exc:
                     st.error(f"Error preparing meeting: {exc}")
                     result = None
 
             if result:
-                result_text = _result_to_markdown(result)
-                st.markdown(result_text)
+                result_text = result
+                st.session_state["last_brief_md"] = result_text
                 try:
+                    # Payloads are callables so Streamlit only materializes them on click;
+                    # they run outside the script run, so close over values, not session_state
                     st.download_button(
                         label="Download meeting brief as .md",
-                        data=result_text,
+                        data=lambda: result_text,
                         file_name=f"meeting_brief_{company_name}.md",
                         mime="text/markdown"
                     )
                 except Exception:
                     pass
 
-                # Generate PPTX deck from the brief
-                if st.button("Generate Slides (PPTX)"):
-                    pptx_bytes = _brief_to_pptx(result_text, title=f"Meeting Brief - {company_name}")
-                    if pptx_bytes:
-                        try:
-                            st.download_button(
-                                label="Download slides",
-                                data=pptx_bytes,
-                                file_name=f"meeting_brief_{company_name}.pptx",
-                                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                                key="download_pptx"
-                            )
-                        except Exception:
-                            pass
-                    else:
-                        st.warning("python-pptx not available. Please install dependencies to enable slide generation.")
+                # Build the PPTX deck in the background while the brief is being read
+                st.session_state["pptx_future"] = _pptx_executor().submit(
+                    _brief_to_pptx_cached, result_text, f"Meeting Brief - {company_name}"
+                )
+                st.session_state["pptx_company"] = company_name
 
                 timestamp = datetime.utcnow().isoformat()
                 history_entry = {
@@ -931,114 +1576,137 @@ Historical notes supplied by the team:
                     "attendees": attendees,
                     "focusAreas": focus_areas,
                     "documents": [doc["name"] for doc in supporting_documents],
-                    "result": result_text,
                 }
-                _save_meeting_to_history(history_entry)
-                st.session_state["history_view"] = history_entry
+                entry_id = _save_meeting_to_history(history_entry, result_text)
+                st.session_state["history_view"] = {"id": entry_id, "company": company_name}
                 st.success("Meeting brief archived in your library.")
 
+    # Generate PPTX deck from the most recent brief; it lives outside the
+    # "Prepare Meeting" branch so the click survives the rerun it triggers
+    pptx_future = st.session_state.get("pptx_future")
+    if pptx_future is not None and st.button("Generate Slides (PPTX)"):
+        if _load_pptx() is None:
+            st.warning("python-pptx not available. Please install dependencies to enable slide generation.")
+        elif not pptx_future.done():
+            st.info("Slides are still being generated. Click again in a moment.")
+        elif pptx_future.exception() is not None:
+            st.error(f"Error generating slides: {pptx_future.exception()}")
+        else:
+            try:
+                st.download_button(
+                    label="Download slides",
+                    data=pptx_future.result,
+                    file_name=f"meeting_brief_{st.session_state.get('pptx_company', company_name)}.pptx",
+                    mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                    key="download_pptx"
+                )
+            except Exception:
+                pass
+
     # Practice Mode (text-only)
     with st.expander("Practice Mode (text-only)"):
         if "practice_history" not in st.session_state:
             st.session_state["practice_history"] = []  # list of {role: 'coach'|'you', content: str}
+        if "practice_recent" not in st.session_state:
+            # Pre-formatted "role: content" lines for the last 10 turns, fed to prompts
+            st.session_state["practice_recent"] = deque(
+                (f"{t['role']}: {t['content']}" for t in st.session_state["practice_history"][-PRACTICE_WINDOW:]),
+                maxlen=PRACTICE_WINDOW,
+            )
 
-        # Show conversation
-        if st.session_state["practice_history"]:
-            st.markdown("### Session log")
-            for turn in st.session_state["practice_history"]:
-                role = turn.get("role", "coach")
-                content = turn.get("content", "")
-                prefix = "Coach" if role == "coach" else "You"
-                st.markdown(f"**{prefix}:**\n\n{content}")
+        # Show conversation; the slot is re-rendered in place after each turn
+        practice_log = st.empty()
+        _render_practice_log(practice_log, st.session_state["practice_history"])
 
         user_resp = st.text_area("Your response", key="practice_user_response", height=120)
+        practice_prompt_fields = {
+            "company": company_name,
+            "objective": meeting_objective,
+            "attendees": attendees,
+            "focus_areas": focus_areas,
+        }
+        # Both buttons are always drawn so a click is never dropped when the
+        # log changes state; the handlers check the history instead
         c1, c2, c3 = st.columns(3)
         with c1:
             ask_next = st.button("Ask next objection", key="ask_next_objection")
         with c2:
-            score_it = st.button("Score my response", key="score_response")
+            submit_next = st.button("Submit & next", key="submit_and_next")
         with c3:
             clear_sess = st.button("Clear session", key="clear_practice_session")
 
         if clear_sess:
             st.session_state["practice_history"] = []
-            st.experimental_rerun()
+            st.session_state["practice_recent"].clear()
+            _render_practice_log(practice_log, st.session_state["practice_history"])
 
-        # Generate next objection
+        # Generate the opening objection
         if ask_next:
-            history_text = "\n".join(
-                [f"{t.get('role', 'coach')}: {t.get('content', '')}" for t in st.session_state["practice_history"]][-10:]
-            )
+            history_text = "\n".join(st.session_state["practice_recent"])
             task = Task(
-                description=f"""
-                Generate the next realistic stakeholder objection for a rehearsal.
-                Company: {company_name}
-                Objective: {meeting_objective}
-                Attendees: {attendees}
-                Focus areas: {focus_areas}
-                Recent practice log (last 10 turns):
-                {history_text}
-
-                Output 1-2 sentences with a sharp, persona-driven objection.
-                """,
-                agent=rehearsal_coach,
+                description=_OBJECTION_PROMPT.format_map(
+                    {**practice_prompt_fields, "history": history_text}
+                ),
+                agent=agents["rehearsal_coach"],
                 expected_output="A concise, realistic objection in 1-2 sentences."
             )
-            temp_crew = Crew(agents=[rehearsal_coach], tasks=[task], verbose=False, process=Process.sequential)
             with st.spinner("Thinking of a tough objection..."):
                 try:
-                    obj_res = temp_crew.kickoff()
+                    obj_res = _kickoff_practice(task)
                 except Exception as exc:
                     st.error(f"Error generating objection: {exc}")
                     obj_res = None
             if obj_res:
                 objection = _result_to_markdown(obj_res)
-                st.session_state["practice_history"].append({"role": "coach", "content": objection})
-                st.experimental_rerun()
-
-        # Score user's response
-        if score_it and user_resp.strip():
-            st.session_state["practice_history"].append({"role": "you", "content": user_resp})
-            history_text = "\n".join(
-                [f"{t.get('role', 'coach')}: {t.get('content', '')}" for t in st.session_state["practice_history"]][-10:]
-            )
+                _append_practice_turn("coach", objection)
+                _render_practice_log(practice_log, st.session_state["practice_history"])
+
+        # The first objection has nothing to score; afterwards one call scores
+        # the response and produces the next objection together
+        if submit_next and not st.session_state["practice_history"]:
+            st.info("Ask for an opening objection before submitting a response.")
+            submit_next = False
+
+        # Score the user's response and ask the next objection in one round trip
+        if submit_next and user_resp.strip():
+            _append_practice_turn("you", user_resp)
+            _render_practice_log(practice_log, st.session_state["practice_history"])
+            history_text = "\n".join(st.session_state["practice_recent"])
             task = Task(
-                description=f"""
-                Evaluate the user's response to the last objection.
-                Provide:
-                - Score (1-10) on clarity, evidence, and relevance
-                - 3 coaching tips to improve
-                - A refined sample answer (3-5 sentences)
-
-                Context: {company_name}, objective: {meeting_objective}, focus areas: {focus_areas}
-                Practice log (last 10 turns):
-                {history_text}
-                User response:
-                {user_resp}
-                """,
-                agent=rehearsal_coach,
-                expected_output="Markdown with a short rubric, 3 tips, and a refined sample answer."
+                description=_PRACTICE_TURN_PROMPT.format_map(
+                    {**practice_prompt_fields, "history": history_text, "user_response": user_resp}
+                ),
+                agent=agents["rehearsal_coach"],
+                expected_output="JSON with keys 'score', 'tips', 'refined_answer', 'next_objection'"
             )
-            temp_crew = Crew(agents=[rehearsal_coach], tasks=[task], verbose=False, process=Process.sequential)
             with st.spinner("Scoring your response..."):
                 try:
-                    score_res = temp_crew.kickoff()
+                    turn_res = _kickoff_practice(task)
                 except Exception as exc:
                     st.error(f"Error scoring response: {exc}")
-                    score_res = None
-            if score_res:
-                feedback = _result_to_markdown(score_res)
-                st.session_state["practice_history"].append({"role": "coach", "content": feedback})
-                st.experimental_rerun()
+                    turn_res = None
+            if turn_res:
+                raw = _result_to_markdown(turn_res)
+                turn = _parse_practice_turn(raw)
+                if turn:
+                    _append_practice_turn("coach", _format_practice_feedback(turn))
+                    if turn.get("next_objection"):
+                        _append_practice_turn("coach", str(turn["next_objection"]))
+                else:
+                    # Model ignored the JSON contract; keep its answer as plain feedback
+                    _append_practice_turn("coach", raw)
+                _render_practice_log(practice_log, st.session_state["practice_history"])
 
     history_preview = st.session_state.get("history_view")
     if history_preview:
         with st.expander("Saved brief preview", expanded=False):
-            st.markdown(history_preview["result"])
+            saved_brief = _load_history_brief(history_preview)
+            st.markdown(saved_brief)
             try:
+                # Deferred callables run without a script run context, so close over the text
                 st.download_button(
                     label="Download selected brief",
-                    data=history_preview["result"],
+                    data=lambda: saved_brief,
                     file_name=f"saved_meeting_brief_{history_preview['company']}.md",
                     mime="text/markdown",
                     key="download_history_brief"